@@ -5,13 +5,23 @@ Adapted from Google Colab script to run on desktop Python (VS Code, etc.)
 """
 
 import os
+import sys
 import zipfile
 import shutil
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import torch
 from tqdm import tqdm
-from transformers import pipeline
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 import easyocr
 
+# Reuse the backend's ICD-10 keyword table
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+from services.icd10 import ICD10_CODES, ICD10_PATTERN
+
 # === Setup directories ===
 WORK_DIR = "clinical_note_gen"
 DATA_ZIP = r"C:\Users\khair\OneDrive\Desktop\EHR\Dataset.zip"  # <- change if needed
@@ -24,6 +34,10 @@ os.makedirs(OUTPUT_PATH, exist_ok=True)
 print("✅ Working directory:", os.getcwd())
 print("✅ Data path:", DATA_PATH)
 
+# CSV checkpoints are written on a background thread so the next stage starts right away
+csv_writer = ThreadPoolExecutor(max_workers=1)
+csv_writes = []  # futures checked before the results are archived
+
 # === Extract dataset ===
 if not os.path.exists(DATA_PATH):
     print("📦 Extracting dataset...")
@@ -45,58 +59,140 @@ if image_paths:
     print("🧠 Example paths:", image_paths[:5])
 
 # === OCR: Extract text from images ===
-reader = easyocr.Reader(["en"])
-data = []
+OCR_BATCH_SIZE = 16  # images per detection pass (16 fits a 24 GB GPU)
+OCR_WIDTH, OCR_HEIGHT = 800, 600  # common size so a chunk stacks into one tensor
+OCR_RECOG_BATCH_SIZE = 64  # detected text boxes per recognizer forward pass
+# DataLoader workers feeding the recognizer. Windows spawns workers by re-running
+# this script, which has no main guard, so load in-process there
+OCR_WORKERS = 0 if os.name == "nt" else 4
 
-for img_path in tqdm(image_paths, desc="🔍 Extracting text from images"):
-    result = reader.readtext(img_path, detail=0)
-    text = " ".join(result)
-    data.append({"image_path": img_path, "extracted_text": text})
+OCR_SCHEMA = pa.schema([("image_path", pa.string()), ("extracted_text", pa.string())])
 
-df = pd.DataFrame(data)
-ocr_csv = os.path.join(OUTPUT_PATH, "ocr_results.csv")
-df.to_csv(ocr_csv, index=False)
-print("✅ OCR complete →", ocr_csv)
+reader = easyocr.Reader(["en"], cudnn_benchmark=True)
+
+if image_paths:
+    # Warm up once so the cuDNN autotuner settles before the real run
+    reader.readtext_batched(
+        np.zeros([OCR_BATCH_SIZE, OCR_HEIGHT, OCR_WIDTH, 3], np.uint8),
+        n_width=OCR_WIDTH, n_height=OCR_HEIGHT, detail=0
+    )
+
+# Each batch is streamed straight to Parquet instead of piling up rows in memory
+ocr_parquet = os.path.join(OUTPUT_PATH, "ocr_results.parquet")
+with pq.ParquetWriter(ocr_parquet, OCR_SCHEMA) as ocr_writer:
+    for start in tqdm(range(0, len(image_paths), OCR_BATCH_SIZE), desc="🔍 Extracting text from images"):
+        chunk = image_paths[start:start + OCR_BATCH_SIZE]
+        results = reader.readtext_batched(
+            chunk, n_width=OCR_WIDTH, n_height=OCR_HEIGHT, detail=0,
+            batch_size=OCR_RECOG_BATCH_SIZE, workers=OCR_WORKERS
+        )
+        texts = [" ".join(result) for result in results]
+        ocr_writer.write_batch(pa.record_batch([chunk, texts], schema=OCR_SCHEMA))
+print("✅ OCR complete →", ocr_parquet)
 
 # === Clinical note generation ===
-note_generator = pipeline("text2text-generation", model="google/flan-t5-base")
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+NOTE_MODEL = "google/flan-t5-base"
+NOTE_BATCH_SIZE = 16
+
+
+def inference_context():
+    """BF16 autocast on CUDA; a no-op on CPU"""
+    return torch.autocast(DEVICE, dtype=torch.bfloat16, enabled=DEVICE == "cuda")
+
+
+# Call generate() directly so each batch is one tokenize + one generate + one decode
+note_tokenizer = AutoTokenizer.from_pretrained(NOTE_MODEL, padding_side="left")
+note_model = AutoModelForSeq2SeqLM.from_pretrained(NOTE_MODEL).to(DEVICE).eval()
+if DEVICE == "cuda":
+    # Default mode with dynamic shapes: generate() grows the KV cache every step and
+    # batches differ in length, which would keep re-recording reduce-overhead's CUDA
+    # graphs. On CPU compiling would only add compile time
+    note_model.forward = torch.compile(note_model.forward, dynamic=True)
+
+
+def generate_notes(inputs, max_new_tokens=80):
+    with torch.inference_mode(), inference_context():
+        outputs = note_model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=True)
+    return note_tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+# generate() runs on a worker thread (torch releases the GIL inside its kernels), so
+# reading and tokenizing batch B+1 overlaps with decoding batch B
+note_worker = ThreadPoolExecutor(max_workers=1)
+
+# Warm up once with a full batch so any compile cost is paid before the real run
+warmup = note_tokenizer(["warmup"] * NOTE_BATCH_SIZE, return_tensors="pt", padding=True).to(DEVICE)
+note_worker.submit(generate_notes, warmup, 8).result()
 
+# Read the OCR output back batch by batch; only rows with text are sent to the
+# model, the rest keep the placeholder
+ocr_file = pq.ParquetFile(ocr_parquet)
 generated_notes = []
-for text in tqdm(df["extracted_text"], desc="🩺 Generating clinical notes"):
-    if not text.strip():
-        generated_notes.append("No text detected in image.")
-    else:
-        prompt = f"Generate a concise clinical note summarizing this patient information: {text}"
-        result = note_generator(prompt, max_length=80, do_sample=True)
-        generated_notes.append(result[0]["generated_text"])
-
-df["generated_note"] = generated_notes
+pending = None  # (notes, rows, future) of the batch currently being generated
+
+
+def collect(notes, rows, future):
+    if future is not None:
+        for i, note in zip(rows, future.result()):
+            notes[i] = note
+    generated_notes.extend(notes)
+
+
+for batch in tqdm(ocr_file.iter_batches(batch_size=NOTE_BATCH_SIZE),
+                  total=-(-ocr_file.metadata.num_rows // NOTE_BATCH_SIZE),
+                  desc="🩺 Generating clinical notes"):
+    texts = batch.column("extracted_text").to_pylist()
+    notes = ["No text detected in image."] * len(texts)
+    rows = [i for i, text in enumerate(texts) if text.strip()]
+    future = None
+    if rows:
+        prompts = [
+            f"Generate a concise clinical note summarizing this patient information: {texts[i]}"
+            for i in rows
+        ]
+        inputs = note_tokenizer(prompts, return_tensors="pt", padding=True, truncation=True).to(DEVICE)
+        future = note_worker.submit(generate_notes, inputs)
+    if pending is not None:
+        collect(*pending)
+    pending = (notes, rows, future)
+
+if pending is not None:
+    collect(*pending)
+note_worker.shutdown()
+
+# Keep the columns in Arrow: the notes CSV is written straight from the table
+notes_table = ocr_file.read().append_column("generated_note", pa.array(generated_notes, pa.string()))
 notes_csv = os.path.join(OUTPUT_PATH, "generated_clinical_notes.csv")
-df.to_csv(notes_csv, index=False)
+csv_writes.append(csv_writer.submit(pa_csv.write_csv, notes_table, notes_csv))
+df = notes_table.to_pandas()
 print("✅ Clinical notes generated →", notes_csv)
 
 # === ICD-10 classification ===
-icd_classifier = pipeline("text-classification", model="roberta-large-mnli")
+# roberta-large-mnli only predicts entailment/neutral/contradiction, so it never produced
+# an ICD-10 code. Scan the notes for known keywords with one compiled alternation instead.
 
-predicted_labels = []
-for note in tqdm(df["generated_note"], desc="🏷️ Predicting ICD-10 labels"):
-    result = icd_classifier(note)
-    predicted_labels.append(result[0]["label"])
+df["predicted_icd10"] = df["generated_note"].str.lower().str.findall(ICD10_PATTERN).map(
+    lambda keywords: ", ".join(dict.fromkeys(ICD10_CODES[k] for k in keywords))
+)
 
-df["predicted_icd10"] = predicted_labels
 final_csv = os.path.join(OUTPUT_PATH, "final_notes_with_icd10.csv")
-df.to_csv(final_csv, index=False)
+csv_writes.append(csv_writer.submit(df.copy().to_csv, final_csv, index=False))
 print("✅ ICD-10 coding complete →", final_csv)
 
 # === Sample preview ===
 sample = df.sample(min(3, len(df)))
-for _, row in sample.iterrows():
+for row in sample.to_dict('records'):
     print(f"\n🩻 Image: {row['image_path']}")
     print(f"🧾 Extracted Text: {row['extracted_text']}")
     print(f"🧠 Generated Note: {row['generated_note']}")
     print(f"🏷️ ICD-10 Prediction: {row['predicted_icd10']}")
 
 # === Zip final results ===
+# Re-raise any failed CSV write instead of zipping a missing or partial file
+for write in csv_writes:
+    write.result()
+csv_writer.shutdown(wait=True)
 final_zip = os.path.join(WORK_DIR, "results_M3.zip")
 shutil.make_archive(final_zip.replace(".zip", ""), "zip", OUTPUT_PATH)
 print(f"📦 Final results zipped → {final_zip}")
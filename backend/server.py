@@ -2,6 +2,8 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import json
 import os
+import sqlite3
+import threading
 
 from services.clinical_notes import (
     generate_soap,
@@ -15,18 +17,68 @@ app = Flask(__name__)
 CORS(app)
 
 PATIENT_FILE = "patients.json"
+PATIENT_DB = "patients.db"
+
+
+def open_db():
+    conn = sqlite3.connect(PATIENT_DB, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS patients ("
+        "id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+    )
+
+    # One-time import of the old JSON store. Several workers can start at once,
+    # so check and insert under one write lock and skip rows already imported
+    if os.path.exists(PATIENT_FILE):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0] == 0:
+                with open(PATIENT_FILE, "r") as f:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO patients (id, data) VALUES (?, ?)",
+                        [(p["id"], json.dumps(p)) for p in json.load(f)]
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return conn
+
+
+# One connection per process, shared by the request threads; db_lock serializes it
+db = open_db()
+db_lock = threading.Lock()
+
+
+def row_to_patient(row):
+    patient = json.loads(row[1])
+    patient["id"] = row[0]
+    return patient
 
 
 def read_patients():
-    if not os.path.exists(PATIENT_FILE):
-        return []
-    with open(PATIENT_FILE, "r") as f:
-        return json.load(f)
+    with db_lock:
+        rows = db.execute("SELECT id, data FROM patients ORDER BY id").fetchall()
+    return [row_to_patient(row) for row in rows]
 
 
-def write_patients(data):
-    with open(PATIENT_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+def read_patient(pid):
+    with db_lock:
+        row = db.execute("SELECT id, data FROM patients WHERE id = ?", (pid,)).fetchone()
+    return row_to_patient(row) if row else None
+
+
+def insert_patient(data):
+    with db_lock, db:
+        cur = db.execute("INSERT INTO patients (data) VALUES (?)", (json.dumps(data),))
+    data["id"] = cur.lastrowid
+    return data
+
+
+def write_patient(pid, data):
+    with db_lock, db:
+        db.execute("UPDATE patients SET data = ? WHERE id = ?", (json.dumps(data), pid))
 
 
 # -------------------------- API ROUTES --------------------------
@@ -65,39 +117,37 @@ def get_patients():
 
 @app.get("/patients/<int:pid>")
 def get_patient(pid):
-    patients = read_patients()
-    for p in patients:
-        if p["id"] == pid:
-            return jsonify(p)
+    patient = read_patient(pid)
+    if patient:
+        return jsonify(patient)
     return jsonify({"error": "Patient not found"}), 404
 
 
 @app.post("/patients")
 def create_patient():
     data = request.json
-    patients = read_patients()
-    
-    data["id"] = len(patients) + 1
-    patients.append(data)
-    write_patients(patients)
+    patient = insert_patient(data)
 
-    return jsonify({"message": "Patient created", "patient": data})
+    return jsonify({"message": "Patient created", "patient": patient})
 
 
 @app.put("/patients/<int:pid>")
 def update_patient(pid):
     data = request.json
-    patients = read_patients()
+    patient = read_patient(pid)
 
-    for i, p in enumerate(patients):
-        if p["id"] == pid:
-            patients[i].update(data)
-            write_patients(patients)
-            return jsonify({"message": "Patient updated", "patient": patients[i]})
+    if patient:
+        patient.update(data)
+        patient["id"] = pid
+        write_patient(pid, patient)
+        return jsonify({"message": "Patient updated", "patient": patient})
 
     return jsonify({"error": "Patient not found"}), 404
 
 
 # ---------------------------------------------------------
+# Development only. In production run several workers, e.g.
+#   gunicorn -w $(nproc) -k gthread --threads 8 -b 0.0.0.0:5000 server:app
 
-app.run(port=5000, debug=True)
+if __name__ == "__main__":
+    app.run(port=5000, debug=True)
@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+import uvicorn
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -98,3 +99,7 @@ def suggest_icd_codes(data: ICD10Request):
 @app.get("/")
 def root():
     return {"message": "Backend running successfully!"}
+
+
+if __name__ == "__main__":
+    uvicorn.run("clinical_notes:app", host="0.0.0.0", port=8000, workers=4)
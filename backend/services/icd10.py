@@ -1,3 +1,5 @@
+import re
+
 ICD10_CODES = {
     "fever": "R50.9",
     "headache": "R51",
@@ -6,12 +8,12 @@ ICD10_CODES = {
     "cough": "R05"
 }
 
-def suggest_codes(text):
-    text = text.lower()
-    results = []
+# One alternation over every keyword, so the text is scanned once
+ICD10_PATTERN = re.compile("|".join(map(re.escape, ICD10_CODES)))
 
-    for keyword, code in ICD10_CODES.items():
-        if keyword in text:
-            results.append({"keyword": keyword, "code": code})
+def suggest_codes(text):
+    found = set(ICD10_PATTERN.findall(text.lower()))
+    # Report hits in ICD10_CODES order, as the per-keyword scan did
+    results = [{"keyword": keyword, "code": code} for keyword, code in ICD10_CODES.items() if keyword in found]
 
     return {"matches": results or [{"message": "No matching ICD-10 codes found"}]}
@@ -96,31 +96,28 @@ class SyntheticDataGenerator:
     
     def generate_sample_ehr_data(self, num_samples: int = 100):
         """Generate synthetic EHR data for testing"""
+        import numpy as np
         import pandas as pd
-        import random
-        from datetime import datetime, timedelta
+        
+        # One generator call per column instead of a Python loop per row
+        rng = np.random.default_rng()
+        ids = np.arange(num_samples).astype(str)
+        days_ago = rng.integers(0, 366, num_samples).astype('timedelta64[D]')
         
         # Sample synthetic data
         data = {
-            'patient_id': [f'P{i:05d}' for i in range(num_samples)],
-            'age': [random.randint(18, 90) for _ in range(num_samples)],
-            'gender': [random.choice(['M', 'F']) for _ in range(num_samples)],
-            'chief_complaint': [
-                random.choice([
-                    'Chest pain', 'Shortness of breath', 'Abdominal pain',
-                    'Headache', 'Joint pain', 'Fever'
-                ]) for _ in range(num_samples)
-            ],
-            'diagnosis': [
-                random.choice([
-                    'Pneumonia', 'Fracture', 'Hypertension',
-                    'Diabetes', 'Arthritis', 'Migraine'
-                ]) for _ in range(num_samples)
-            ],
-            'visit_date': [
-                (datetime.now() - timedelta(days=random.randint(0, 365))).strftime('%Y-%m-%d')
-                for _ in range(num_samples)
-            ]
+            'patient_id': np.char.add('P', np.char.zfill(ids, 5)),
+            'age': rng.integers(18, 91, num_samples),
+            'gender': rng.choice(['M', 'F'], num_samples),
+            'chief_complaint': rng.choice([
+                'Chest pain', 'Shortness of breath', 'Abdominal pain',
+                'Headache', 'Joint pain', 'Fever'
+            ], num_samples),
+            'diagnosis': rng.choice([
+                'Pneumonia', 'Fracture', 'Hypertension',
+                'Diabetes', 'Arthritis', 'Migraine'
+            ], num_samples),
+            'visit_date': (np.datetime64('today', 'D') - days_ago).astype(str)
         }
         
         df = pd.DataFrame(data)
@@ -132,8 +129,8 @@ class SyntheticDataGenerator:
     
     def generate_sample_clinical_notes(self, num_notes: int = 50):
         """Generate synthetic clinical notes"""
+        import numpy as np
         import pandas as pd
-        import random
         
         templates = [
             "Patient presents with {complaint}. Physical exam reveals {finding}. "
@@ -151,20 +148,23 @@ class SyntheticDataGenerator:
         diagnoses = ['viral infection', 'bacterial infection', 'chronic condition', 'acute injury']
         plans = ['rest and fluids', 'antibiotic therapy', 'follow-up in 1 week', 'imaging ordered']
         
-        notes = []
-        for i in range(num_notes):
-            template = random.choice(templates)
-            note = template.format(
-                complaint=random.choice(complaints),
-                finding=random.choice(findings),
-                diagnosis=random.choice(diagnoses),
-                plan=random.choice(plans)
-            )
-            notes.append({
-                'note_id': f'N{i:05d}',
-                'patient_id': f'P{random.randint(0, 99):05d}',
-                'note_text': note
-            })
+        # Format every template/field combination once, then sample whole notes.
+        # Picking a combination uniformly is the same as picking each field uniformly.
+        all_notes = np.array([
+            template.format(complaint=complaint, finding=finding, diagnosis=diagnosis, plan=plan)
+            for template in templates
+            for complaint in complaints
+            for finding in findings
+            for diagnosis in diagnoses
+            for plan in plans
+        ])
+        
+        rng = np.random.default_rng()
+        notes = {
+            'note_id': np.char.add('N', np.char.zfill(np.arange(num_notes).astype(str), 5)),
+            'patient_id': np.char.add('P', np.char.zfill(rng.integers(0, 100, num_notes).astype(str), 5)),
+            'note_text': all_notes[rng.integers(0, len(all_notes), num_notes)]
+        }
         
         df = pd.DataFrame(notes)
         output_file = self.output_dir / 'synthetic_clinical_notes.csv'
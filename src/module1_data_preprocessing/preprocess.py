@@ -4,6 +4,9 @@ Handles collection, cleaning, and standardization of medical imaging and EHR dat
 """
 
 import os
+import re
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 import pydicom
@@ -17,6 +20,12 @@ from sklearn.model_selection import train_test_split
 import yaml
 from dotenv import load_dotenv
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # Load environment variables
 load_dotenv()
 
@@ -25,6 +34,41 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _zscore_kernel(flat: np.ndarray, out: np.ndarray):
+        """One-pass sum/sum-of-squares z-score over a flat image"""
+        n = flat.size
+        acc = 0.0
+        acc2 = 0.0
+        for i in prange(n):
+            v = float(flat[i])
+            acc += v
+            acc2 += v * v
+        mean = acc / n
+        std = np.sqrt(max(acc2 / n - mean * mean, 0.0))
+        inv = 1.0 / (std + 1e-8)
+        for i in prange(n):
+            out[i] = (flat[i] - mean) * inv
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _zscore_batch_kernel(stack: np.ndarray, out: np.ndarray):
+        """Per-image z-score over an (N, H*W) stack, one image per thread"""
+        count, n = stack.shape
+        for b in prange(count):
+            acc = 0.0
+            acc2 = 0.0
+            for i in range(n):
+                v = float(stack[b, i])
+                acc += v
+                acc2 += v * v
+            mean = acc / n
+            std = np.sqrt(max(acc2 / n - mean * mean, 0.0))
+            inv = 1.0 / (std + 1e-8)
+            for i in range(n):
+                out[b, i] = (stack[b, i] - mean) * inv
+
+
 class MedicalImageLoader:
     """Load and preprocess medical images from various formats"""
     
@@ -83,14 +127,35 @@ class MedicalImageLoader:
             logger.warning(f"Unsupported file format: {ext}")
             return None
     
+    def load_many(self, file_paths: List[str], workers: Optional[int] = None,
+                  chunksize: int = 16) -> List[Optional[np.ndarray]]:
+        """
+        Load many medical images in parallel worker processes
+        
+        pydicom/NIfTI parsing holds the GIL, so a process pool is used. Windowing
+        runs inside the workers, so DICOMs come back already converted to uint8.
+        Results are returned in the same order as file_paths.
+        """
+        if workers is None:
+            workers = os.cpu_count()
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.load_image, file_paths, chunksize=chunksize))
+    
     @staticmethod
     def _apply_windowing(image: np.ndarray, center: float, width: float) -> np.ndarray:
         """Apply window/level adjustment to medical image"""
         img_min = center - width // 2
         img_max = center + width // 2
-        image = np.clip(image, img_min, img_max)
-        image = ((image - img_min) / (img_max - img_min) * 255).astype(np.uint8)
-        return image
+        span = img_max - img_min
+        
+        # Shift, clip and scale in one float32 buffer, writing the scaled
+        # values straight into the uint8 output instead of a separate astype pass
+        shifted = np.subtract(image, img_min, dtype=np.float32)
+        np.clip(shifted, 0, span, out=shifted)
+        windowed = np.empty(image.shape, dtype=np.uint8)
+        np.multiply(shifted, 255.0 / span, out=windowed, casting='unsafe')
+        return windowed
 
 
 class DataPreprocessor:
@@ -108,6 +173,10 @@ class DataPreprocessor:
             method = self.norm_method
         
         if method == 'z_score':
+            if NUMBA_AVAILABLE:
+                out = np.empty(image.shape, dtype=np.float64)
+                _zscore_kernel(np.ascontiguousarray(image).ravel(), out.ravel())
+                return out
             mean = np.mean(image)
             std = np.std(image)
             return (image - mean) / (std + 1e-8)
@@ -119,15 +188,55 @@ class DataPreprocessor:
             logger.warning(f"Unknown normalization method: {method}")
             return image
     
+    def normalize_batch(self, images: np.ndarray, method: str = None) -> np.ndarray:
+        """Normalize each image of an (N, H, W) stack independently"""
+        if method is None:
+            method = self.norm_method
+        
+        if method == 'z_score':
+            if NUMBA_AVAILABLE:
+                out = np.empty(images.shape, dtype=np.float64)
+                _zscore_batch_kernel(
+                    np.ascontiguousarray(images).reshape(len(images), -1),
+                    out.reshape(len(images), -1)
+                )
+                return out
+            axes = tuple(range(1, images.ndim))
+            mean = np.mean(images, axis=axes, keepdims=True)
+            std = np.std(images, axis=axes, keepdims=True)
+            return (images - mean) / (std + 1e-8)
+        elif method == 'min_max':
+            axes = tuple(range(1, images.ndim))
+            min_val = np.min(images, axis=axes, keepdims=True)
+            max_val = np.max(images, axis=axes, keepdims=True)
+            return (images - min_val) / (max_val - min_val + 1e-8)
+        else:
+            logger.warning(f"Unknown normalization method: {method}")
+            return images
+    
     def resize(self, image: np.ndarray, size: Tuple[int, int] = None) -> np.ndarray:
         """Resize image to target size"""
         if size is None:
             size = self.image_size
         return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
     
-    def denoise(self, image: np.ndarray) -> np.ndarray:
-        """Apply basic denoising"""
-        return cv2.fastNlMeansDenoising(image.astype(np.uint8))
+    def denoise(self, image: np.ndarray, method: str = "bilateral") -> np.ndarray:
+        """
+        Apply basic denoising
+        
+        Methods:
+        - bilateral: Bilateral Filter (edge-preserving, much faster than NLM)
+        - nlm: Non-Local Means Denoising
+        """
+        image = image.astype(np.uint8)
+        
+        if method == "bilateral":
+            return cv2.bilateralFilter(image, d=5, sigmaColor=50, sigmaSpace=50)
+        elif method == "nlm":
+            return cv2.fastNlMeansDenoising(image)
+        else:
+            logger.warning(f"Unknown denoising method: {method}")
+            return image
     
     def augment(self, image: np.ndarray) -> List[np.ndarray]:
         """Apply data augmentation"""
@@ -166,6 +275,60 @@ class DataPreprocessor:
         if normalize:
             image = self.normalize(image)
         return image
+    
+    def batch_preprocess(self, images: List[np.ndarray], **kwargs) -> List[np.ndarray]:
+        """Run the preprocessing pipeline over a list of images"""
+        return [self.preprocess(image, **kwargs) for image in images]
+    
+    def preprocess_batch(self, images: List[np.ndarray],
+                         normalize: bool = True,
+                         resize: bool = True,
+                         denoise: bool = False) -> np.ndarray:
+        """
+        Run the preprocessing pipeline over a batch and return one stacked array
+        
+        Images are resized (and denoised) straight into one preallocated
+        (N, H, W[, C]) buffer, and the whole stack is normalized by a single
+        normalize_batch call instead of allocating and normalizing per image.
+        Batches mixing channel layouts or dtypes go through preprocess per image.
+        
+        Raises:
+            ValueError: If the batch is empty or the preprocessed images differ
+                in shape (e.g. mixed sizes with resize=False); use
+                batch_preprocess for a list instead
+        """
+        if not images:
+            raise ValueError("preprocess_batch needs at least one image")
+        
+        first = images[0]
+        uniform = all(
+            image.dtype == first.dtype and image.shape[2:] == first.shape[2:]
+            for image in images
+        )
+        # denoise() returns uint8, which only fits a uint8 buffer
+        if not resize or not uniform or (denoise and first.dtype != np.uint8):
+            return np.stack([
+                self.preprocess(image, normalize=normalize, resize=resize, denoise=denoise)
+                for image in images
+            ])
+        
+        # Size the buffer from a real resize so channel handling matches preprocess
+        # (cv2.resize drops a trailing single channel, keeps 3 or 4)
+        resized = self.resize(first)
+        batch = np.empty((len(images),) + resized.shape, dtype=resized.dtype)
+        batch[0] = resized
+        for i, image in enumerate(images[1:], start=1):
+            cv2.resize(image, self.image_size, dst=batch[i], interpolation=cv2.INTER_AREA)
+        if denoise:
+            for i in range(len(images)):
+                batch[i] = self.denoise(batch[i])
+        
+        return self.normalize_batch(batch) if normalize else batch
+
+
+# Whitespace runs (group 1) collapse to one space; anything that is not a word
+# character, whitespace or medical notation (- / .) is dropped
+CLINICAL_NOTE_CLEANUP = re.compile(r'(\s+)|[^\w\s\-\/\.]+')
 
 
 class EHRDataProcessor:
@@ -191,12 +354,14 @@ class EHRDataProcessor:
     
     def clean_clinical_notes(self, notes: pd.Series) -> pd.Series:
         """Clean and standardize clinical notes"""
-        # Remove extra whitespace
+        # Remove extra whitespace and special characters (keeping medical
+        # notation) in a single regex pass
         notes = notes.str.strip()
-        notes = notes.str.replace(r'\s+', ' ', regex=True)
-        
-        # Remove special characters but keep medical notation
-        notes = notes.str.replace(r'[^\w\s\-\/\.]', '', regex=True)
+        notes = notes.str.replace(
+            CLINICAL_NOTE_CLEANUP,
+            lambda m: ' ' if m.group(1) else '',
+            regex=True
+        )
         
         return notes
     
@@ -213,9 +378,14 @@ class EHRDataProcessor:
             df = df.drop('patient_name', axis=1)
         
         if 'patient_id' in df.columns:
-            df['patient_id'] = df['patient_id'].apply(
-                lambda x: hash(str(x)) % 1000000
-            )
+            # SHA-256 pseudonyms are stable across runs, unlike the salted built-in hash().
+            # Each distinct ID is hashed once and mapped back onto the column.
+            ids = df['patient_id'].astype(str)
+            pseudonyms = {
+                pid: hashlib.sha256(pid.encode()).hexdigest()[:16]
+                for pid in ids.unique()
+            }
+            df['patient_id'] = ids.map(pseudonyms)
         
         # Remove dates or convert to age
         if 'date_of_birth' in df.columns:
@@ -0,0 +1,68 @@
+"""
+Module 2: Medical Imaging Enhancement
+Pixelwise Non-Local Means denoising compiled with Numba
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+def _patch_gaussian(patch_radius: int) -> np.ndarray:
+    """Normalized Gaussian patch weights as a flat C-contiguous float32 array"""
+    size = 2 * patch_radius + 1
+    sigma = max(patch_radius / 2.0, 1.0)
+    offsets = np.arange(size, dtype=np.float32) - patch_radius
+    g = np.exp(-(offsets[:, None] ** 2 + offsets[None, :] ** 2) / (2 * sigma * sigma))
+    return np.ascontiguousarray((g / g.sum()).ravel(), dtype=np.float32)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _nlm_kernel(padded: np.ndarray, out: np.ndarray, h: np.float32,
+                search_radius: int, patch_radius: int, g_alpha: np.ndarray):
+    """Weighted average over the search window, one output row per thread"""
+    height, width = out.shape
+    size = 2 * patch_radius + 1
+    offset = search_radius + patch_radius
+    inv_h2 = np.float32(1.0) / (h * h)
+    for i in prange(height):
+        ci = i + offset
+        for j in range(width):
+            cj = j + offset
+            weight_sum = np.float32(0.0)
+            acc = np.float32(0.0)
+            for di in range(-search_radius, search_radius + 1):
+                ni = ci + di
+                for dj in range(-search_radius, search_radius + 1):
+                    nj = cj + dj
+                    # Gaussian-weighted squared distance between the two patches
+                    dist = np.float32(0.0)
+                    for pi in range(size):
+                        for pj in range(size):
+                            diff = (padded[ci + pi - patch_radius, cj + pj - patch_radius]
+                                    - padded[ni + pi - patch_radius, nj + pj - patch_radius])
+                            dist += g_alpha[pi * size + pj] * diff * diff
+                    weight = np.exp(-dist * inv_h2)
+                    weight_sum += weight
+                    acc += weight * padded[ni, nj]
+            out[i, j] = acc / weight_sum
+
+
+def nlm(img: np.ndarray, h: float = 10.0, S: int = 10, K: int = 3) -> np.ndarray:
+    """
+    Non-Local Means denoising of a single-channel uint8 image
+    
+    Args:
+        img: Grayscale image
+        h: Filter strength; larger values smooth more
+        S: Search window radius ((2S+1)^2 candidate pixels)
+        K: Patch radius ((2K+1)^2 pixels per patch)
+    
+    Returns:
+        Denoised uint8 image
+    """
+    g_alpha = _patch_gaussian(K)
+    padded = np.pad(img.astype(np.float32), S + K, mode='reflect')
+    out = np.empty(img.shape, dtype=np.float32)
+    _nlm_kernel(padded, out, np.float32(h), S, K, g_alpha)
+    np.clip(out, 0, 255, out=out)
+    return np.rint(out, out=out).astype(np.uint8)
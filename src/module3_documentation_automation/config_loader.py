@@ -0,0 +1,17 @@
+"""
+Shared YAML config loading for the EHR system modules
+"""
+
+from functools import lru_cache
+from typing import Dict
+import yaml
+
+# libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=None)
+def load_config(config_path: str) -> Dict:
+    """Parse a YAML config once per path; callers share the result read-only"""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=YAML_LOADER)
@@ -4,30 +4,49 @@ Uses GenAI and Azure OpenAI to enhance medical image quality
 """
 
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import cv2
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import logging
-import yaml
 from dotenv import load_dotenv
 from openai import AzureOpenAI
-import base64
-from io import BytesIO
-from PIL import Image
-import torch
-import torch.nn as nn
+
+from module3_documentation_automation.config_loader import load_config
+
+# SIMD base64 codec when installed; same API as the standard library
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    from module2_image_enhancement.nlm_numba import nlm as nlm_numba
+    NLM_NUMBA_AVAILABLE = True
+except ImportError:
+    NLM_NUMBA_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# OpenCV's default PNG settings (level 1, RLE strategy) are already its fastest;
+# passing IMWRITE_PNG_COMPRESSION switches to the slower default zlib strategy
+PNG_WRITE_PARAMS = []
+
 
 class AzureImageEnhancer:
     """Use Azure OpenAI for medical image enhancement and analysis"""
     
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.client = AzureOpenAI(
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
@@ -38,28 +57,40 @@ class AzureImageEnhancer:
         self.vision_deployment = os.getenv("AZURE_OPENAI_VISION_DEPLOYMENT", "gpt-4-vision")
         self.gpt4_deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4")
     
-    def encode_image(self, image: np.ndarray) -> str:
-        """Encode image to base64 for API"""
-        if len(image.shape) == 2:
-            image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    def encode_image(self, image: np.ndarray, lossless: bool = False) -> str:
+        """
+        Encode image to base64 for API
         
-        # Convert to PIL Image
-        pil_image = Image.fromarray(image.astype('uint8'))
+        JPEG at quality 90 by default, which is far smaller on the wire than PNG
+        and visually equivalent for the vision model; lossless=True keeps PNG.
+        Grayscale images are encoded as single-channel, without an RGB copy.
+        """
+        if image.dtype != np.uint8:
+            image = image.astype(np.uint8)
+        if image.ndim == 3:
+            # Callers pass RGB; OpenCV encodes BGR
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
         
-        # Encode to base64
-        buffered = BytesIO()
-        pil_image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        if lossless:
+            _, buffer = cv2.imencode('.png', image)
+        else:
+            _, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
         
-        return img_str
+        return base64.b64encode(buffer).decode('ascii')
     
-    def analyze_medical_image(self, image: np.ndarray, modality: str = "xray") -> str:
+    def analyze_medical_image(
+        self,
+        image: np.ndarray,
+        modality: str = "xray",
+        lossless: bool = False
+    ) -> str:
         """
         Analyze medical image using Azure OpenAI Vision
         Returns description and potential findings
         """
         try:
-            img_base64 = self.encode_image(image)
+            img_base64 = self.encode_image(image, lossless=lossless)
+            mime_type = "image/png" if lossless else "image/jpeg"
             
             response = self.client.chat.completions.create(
                 model=self.vision_deployment,
@@ -80,7 +111,7 @@ class AzureImageEnhancer:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/png;base64,{img_base64}"
+                                    "url": f"data:{mime_type};base64,{img_base64}"
                                 }
                             }
                         ]
@@ -126,15 +157,78 @@ class AzureImageEnhancer:
 class TraditionalImageEnhancer:
     """Traditional image enhancement techniques"""
     
-    def __init__(self):
-        self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+    _SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                                [-1,  9, -1],
+                                [-1, -1, -1]], dtype=np.float32)
+    
+    def __init__(self, srcnn_model_path: Optional[str] = None, srcnn_precision: str = "fp32"):
+        # CLAHE objects hold scratch buffers, so each thread gets its own
+        self._local = threading.local()
+        
+        # SRCNN session for super_resolution(method="srcnn"), created once up front.
+        # srcnn_precision="int8" runs a weight-quantized copy on CPU-only hosts
+        self._srcnn = None
+        if srcnn_model_path and ONNXRUNTIME_AVAILABLE:
+            providers = [
+                p for p in ("CUDAExecutionProvider", "CPUExecutionProvider")
+                if p in ort.get_available_providers()
+            ]
+            if srcnn_precision == "int8" and providers[0] == "CPUExecutionProvider":
+                srcnn_model_path = self._quantize_srcnn(srcnn_model_path)
+            self._srcnn = ort.InferenceSession(srcnn_model_path, providers=providers)
+        elif srcnn_model_path:
+            logger.warning("onnxruntime is not installed, SRCNN super-resolution disabled")
+    
+    @staticmethod
+    def _quantize_srcnn(model_path: str) -> str:
+        """Path of an int8 copy of the SRCNN model, quantized once next to the original"""
+        quantized_path = Path(model_path).with_suffix('.int8.onnx')
+        if not quantized_path.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            logger.info(f"Quantizing SRCNN model to {quantized_path}")
+            # ConvInteger's CPU kernel takes unsigned 8-bit weights
+            quantize_dynamic(model_path, str(quantized_path), weight_type=QuantType.QUInt8)
+        return str(quantized_path)
     
-    def denoise(self, image: np.ndarray, method: str = "nlm") -> np.ndarray:
+    def _thread_clahe(self, name: str, clip_limit: float):
+        """This thread's cached CLAHE object for the given clip limit"""
+        clahe = getattr(self._local, name, None)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+            setattr(self._local, name, clahe)
+        return clahe
+    
+    @property
+    def clahe(self):
+        """CLAHE used by the 'clahe' contrast methods"""
+        return self._thread_clahe('clahe', 2.0)
+    
+    @property
+    def clahe_adaptive(self):
+        """Stronger CLAHE used by the 'adaptive' contrast method"""
+        return self._thread_clahe('clahe_adaptive', 3.0)
+    
+    @staticmethod
+    def _to_uint8(image: np.ndarray) -> np.ndarray:
+        """Min-max scale non-uint8 images to uint8 in a single OpenCV pass"""
+        if image.dtype == np.uint8:
+            return image
+        return cv2.normalize(image, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+    
+    def denoise(
+        self,
+        image: np.ndarray,
+        method: str = "nlm",
+        dst: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Apply denoising to medical image
         
+        dst is an optional output buffer reused by the OpenCV methods.
+        
         Methods:
         - nlm: Non-Local Means Denoising
+        - nlm_numba: Non-Local Means via the Numba kernel in nlm_numba
         - gaussian: Gaussian Blur
         - bilateral: Bilateral Filter
         """
@@ -142,67 +236,116 @@ class TraditionalImageEnhancer:
             image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
         
         # Ensure uint8 format
-        if image.dtype != np.uint8:
-            image = ((image - image.min()) / (image.max() - image.min()) * 255).astype(np.uint8)
+        image = self._to_uint8(image)
         
         if method == "nlm":
-            return cv2.fastNlMeansDenoising(image, None, h=10, templateWindowSize=7, searchWindowSize=21)
+            return cv2.fastNlMeansDenoising(image, dst, h=10, templateWindowSize=7, searchWindowSize=21)
+        elif method == "nlm_numba":
+            if not NLM_NUMBA_AVAILABLE:
+                logger.warning("Numba is not installed, falling back to OpenCV NLM")
+                return cv2.fastNlMeansDenoising(image, dst, h=10, templateWindowSize=7, searchWindowSize=21)
+            return nlm_numba(image, h=10.0, S=10, K=3)
         elif method == "gaussian":
-            return cv2.GaussianBlur(image, (5, 5), 0)
+            return cv2.GaussianBlur(image, (5, 5), 0, dst=dst)
         elif method == "bilateral":
-            return cv2.bilateralFilter(image, 9, 75, 75)
+            return cv2.bilateralFilter(image, 9, 75, 75, dst=dst)
         else:
             logger.warning(f"Unknown denoising method: {method}")
             return image
     
-    def enhance_contrast(self, image: np.ndarray, method: str = "clahe") -> np.ndarray:
+    def enhance_contrast(
+        self,
+        image: np.ndarray,
+        method: str = "clahe",
+        dst: Optional[np.ndarray] = None
+    ) -> np.ndarray:
         """
         Enhance contrast of medical image
         
+        dst is an optional output buffer for the grayscale methods.
+        
         Methods:
         - clahe: Contrast Limited Adaptive Histogram Equalization
         - histogram_eq: Global Histogram Equalization
         - adaptive: Adaptive Histogram Equalization
+        - clahe_lab: CLAHE on the L channel of RGB input, keeping color
         """
+        # Common case: grayscale uint8 straight into CLAHE
+        if method == "clahe" and image.ndim == 2 and image.dtype == np.uint8:
+            return self.clahe.apply(image, dst=dst)
+        
+        if method == "clahe_lab" and image.ndim == 3:
+            lab = cv2.cvtColor(self._to_uint8(image), cv2.COLOR_RGB2LAB)
+            lab[:, :, 0] = self.clahe.apply(lab[:, :, 0])
+            return cv2.cvtColor(lab, cv2.COLOR_LAB2RGB)
+        
         if len(image.shape) == 3:
             image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
         
-        if image.dtype != np.uint8:
-            image = ((image - image.min()) / (image.max() - image.min()) * 255).astype(np.uint8)
+        image = self._to_uint8(image)
         
-        if method == "clahe":
-            return self.clahe.apply(image)
+        if method in ("clahe", "clahe_lab"):
+            return self.clahe.apply(image, dst=dst)
         elif method == "histogram_eq":
-            return cv2.equalizeHist(image)
+            return cv2.equalizeHist(image, dst=dst)
         elif method == "adaptive":
-            return cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(image)
+            return self.clahe_adaptive.apply(image, dst=dst)
         else:
             logger.warning(f"Unknown contrast method: {method}")
             return image
     
-    def sharpen(self, image: np.ndarray) -> np.ndarray:
-        """Apply sharpening filter"""
-        kernel = np.array([[-1, -1, -1],
-                          [-1,  9, -1],
-                          [-1, -1, -1]])
-        return cv2.filter2D(image, -1, kernel)
+    def sharpen(self, image: np.ndarray, dst: Optional[np.ndarray] = None) -> np.ndarray:
+        """Apply sharpening filter, optionally into a reused dst buffer"""
+        return cv2.filter2D(image, -1, self._SHARPEN_KERNEL, dst=dst)
     
-    def super_resolution(self, image: np.ndarray, scale_factor: int = 2) -> np.ndarray:
+    def super_resolution(
+        self,
+        image: np.ndarray,
+        scale_factor: int = 2,
+        method: str = "cubic"
+    ) -> np.ndarray:
         """
-        Simple super-resolution using interpolation
-        For production, use deep learning models
+        Super-resolution using interpolation or a pretrained SRCNN
+        
+        Methods:
+        - cubic: Bicubic interpolation
+        - lanczos: Lanczos interpolation (sharper, several times slower)
+        - srcnn: SRCNN ONNX model refining a bicubic upscale (needs srcnn_model_path)
         """
         height, width = image.shape[:2]
         new_size = (width * scale_factor, height * scale_factor)
-        return cv2.resize(image, new_size, interpolation=cv2.INTER_CUBIC)
+        
+        if method == "lanczos":
+            return cv2.resize(image, new_size, interpolation=cv2.INTER_LANCZOS4)
+        
+        upscaled = cv2.resize(image, new_size, interpolation=cv2.INTER_CUBIC)
+        if method == "srcnn":
+            if self._srcnn is None:
+                logger.warning("SRCNN model not loaded, using bicubic interpolation")
+                return upscaled
+            return self._apply_srcnn(upscaled)
+        return upscaled
+    
+    def _apply_srcnn(self, image: np.ndarray) -> np.ndarray:
+        """Run SRCNN on the luminance of a bicubic-upscaled image"""
+        if image.ndim == 3:
+            ycrcb = cv2.cvtColor(image, cv2.COLOR_RGB2YCrCb)
+            ycrcb[:, :, 0] = self._apply_srcnn(ycrcb[:, :, 0])
+            return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2RGB)
+        
+        model_input = (image.astype(np.float32) / 255.0)[None, None]
+        output = self._srcnn.run(None, {self._srcnn.get_inputs()[0].name: model_input})[0]
+        return np.clip(output[0, 0] * 255.0 + 0.5, 0, 255).astype(np.uint8)
     
     def edge_enhancement(self, image: np.ndarray) -> np.ndarray:
         """Enhance edges for better structure visibility"""
-        # Sobel edge detection
-        sobelx = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
-        sobely = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
-        edges = np.sqrt(sobelx**2 + sobely**2)
-        edges = ((edges - edges.min()) / (edges.max() - edges.min()) * 255).astype(np.uint8)
+        image = self._to_uint8(image)
+        
+        # Sobel edge detection (float32 gradients, fused magnitude and min-max scaling)
+        sobelx = cv2.Sobel(image, cv2.CV_32F, 1, 0, ksize=3)
+        sobely = cv2.Sobel(image, cv2.CV_32F, 0, 1, ksize=3)
+        edges = cv2.magnitude(sobelx, sobely)
+        edges = cv2.normalize(edges, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
         
         # Combine with original
         enhanced = cv2.addWeighted(image, 0.7, edges, 0.3, 0)
@@ -217,13 +360,21 @@ class DiffusionImageEnhancer:
     
     def __init__(self, model_path: Optional[str] = None):
         self.model_path = model_path
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-        logger.info(f"Using device: {self.device}")
+        self._device = None
+    
+    @property
+    def device(self):
+        """Torch device, probed on first use so importing this module stays cheap"""
+        if self._device is None:
+            import torch
+            self._device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            logger.info(f"Using device: {self._device}")
+        return self._device
     
     def load_model(self):
         """Load pre-trained diffusion model"""
         # Placeholder - would load actual diffusion model
-        logger.info("Diffusion model loading (placeholder)")
+        logger.info(f"Diffusion model loading on {self.device} (placeholder)")
         # In production, use models like:
         # - Stable Diffusion for image enhancement
         # - Custom trained models on medical images
@@ -252,23 +403,41 @@ class MedicalImageEnhancementPipeline:
     """Complete enhancement pipeline for medical images"""
     
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.azure_enhancer = AzureImageEnhancer(config_path)
-        self.traditional_enhancer = TraditionalImageEnhancer()
+        sr_config = self.config.get('image_enhancement', {}).get('super_resolution', {})
+        self.super_resolution_method = sr_config.get('method', 'cubic')
+        self.traditional_enhancer = TraditionalImageEnhancer(
+            sr_config.get('model_path'), sr_config.get('precision', 'fp32')
+        )
         self.diffusion_enhancer = DiffusionImageEnhancer()
+        
+        # image_enhancement.batch_denoise_method: denoiser for batch_enhance.
+        # Bilateral is far cheaper than NLM; set "nlm" for the full pipeline
+        self.batch_denoise_method = self.config.get('image_enhancement', {}).get(
+            'batch_denoise_method', 'bilateral'
+        )
+        
+        # Per-thread scratch buffers for batch_enhance
+        self._local = threading.local()
     
     def enhance_image(
         self, 
         image: np.ndarray,
         modality: str = "xray",
         analyze_first: bool = True,
-        apply_super_resolution: bool = False
+        apply_super_resolution: bool = False,
+        denoise_method: str = "nlm",
+        scratch: Optional[Tuple[np.ndarray, np.ndarray]] = None
     ) -> Tuple[np.ndarray, Optional[str]]:
         """
         Complete enhancement pipeline
         
+        denoise_method is passed to TraditionalImageEnhancer.denoise. scratch is
+        an optional pair of buffers shaped like the grayscale image that the
+        steps alternate between; the result may then live in one of them.
+        
         Returns:
             enhanced_image: Enhanced image
             analysis: Image analysis report (if analyze_first=True)
@@ -281,33 +450,84 @@ class MedicalImageEnhancementPipeline:
             analysis = self.azure_enhancer.analyze_medical_image(image, modality)
             logger.info(f"Analysis: {analysis}")
         
+        buffer_a, buffer_b = scratch if scratch is not None else (None, None)
+        
         # Step 2: Denoise
         logger.info("Applying denoising...")
-        enhanced = self.traditional_enhancer.denoise(image)
+        enhanced = self.traditional_enhancer.denoise(image, method=denoise_method, dst=buffer_a)
         
         # Step 3: Enhance contrast
         logger.info("Enhancing contrast...")
-        enhanced = self.traditional_enhancer.enhance_contrast(enhanced)
+        enhanced = self.traditional_enhancer.enhance_contrast(enhanced, dst=buffer_b)
         
         # Step 4: Sharpen
         logger.info("Sharpening image...")
-        enhanced = self.traditional_enhancer.sharpen(enhanced)
+        enhanced = self.traditional_enhancer.sharpen(enhanced, dst=buffer_a)
         
         # Step 5: Super-resolution (optional)
         if apply_super_resolution:
             scale_factor = self.config['image_enhancement']['super_resolution']['scale_factor']
             logger.info(f"Applying super-resolution (scale: {scale_factor}x)...")
-            enhanced = self.traditional_enhancer.super_resolution(enhanced, scale_factor)
+            enhanced = self.traditional_enhancer.super_resolution(
+                enhanced, scale_factor, method=self.super_resolution_method
+            )
         
         return enhanced, analysis
     
+    def enhance_batch(
+        self,
+        images: List[np.ndarray],
+        modality: str = "xray",
+        analyze_first: bool = True,
+        apply_super_resolution: bool = False,
+        return_exceptions: bool = False
+    ) -> List[Tuple[np.ndarray, Optional[str]]]:
+        """
+        Enhance several in-memory images with the same options
+        
+        Used by the API micro-batcher. Images may differ in size, so rather than
+        being stacked they are enhanced concurrently on a thread pool; the OpenCV
+        steps and the Azure analysis requests both release the GIL.
+        
+        Args:
+            return_exceptions: Return an image's exception in its slot instead of
+                raising it, so one bad image does not fail the whole batch
+        
+        Returns:
+            (enhanced_image, analysis) per input image, in order
+        """
+        def enhance(image):
+            try:
+                return self.enhance_image(image, modality, analyze_first, apply_super_resolution)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return e
+        
+        if len(images) == 1:
+            return [enhance(images[0])]
+        
+        with ThreadPoolExecutor(max_workers=min(len(images), os.cpu_count() or 1)) as executor:
+            return list(executor.map(enhance, images))
+    
     def batch_enhance(
         self,
         input_dir: Path,
         output_dir: Path,
-        modality: str = "xray"
+        modality: str = "xray",
+        max_workers: Optional[int] = None,
+        denoise_method: Optional[str] = None
     ):
-        """Enhance all images in a directory"""
+        """
+        Enhance all images in a directory
+        
+        Images are processed on a thread pool; the OpenCV calls release the GIL,
+        so files are enhanced in parallel across cores. denoise_method defaults
+        to the image_enhancement.batch_denoise_method config key ("bilateral"
+        when unset); pass a method to override it for one call.
+        """
+        if denoise_method is None:
+            denoise_method = self.batch_denoise_method
         input_dir = Path(input_dir)
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -316,19 +536,33 @@ class MedicalImageEnhancementPipeline:
         
         logger.info(f"Found {len(image_files)} images to enhance")
         
-        for img_path in image_files:
-            logger.info(f"Processing {img_path.name}...")
-            
-            # Load image
-            image = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
-            
-            # Enhance
-            enhanced, _ = self.enhance_image(image, modality, analyze_first=False)
-            
-            # Save
-            output_path = output_dir / f"enhanced_{img_path.name}"
-            cv2.imwrite(str(output_path), enhanced)
-            logger.info(f"Saved to {output_path}")
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            list(executor.map(
+                lambda img_path: self._process_one(img_path, output_dir, modality, denoise_method),
+                image_files
+            ))
+    
+    def _process_one(self, img_path: Path, output_dir: Path, modality: str, denoise_method: str):
+        """Load, enhance and save one image for batch_enhance"""
+        logger.info(f"Processing {img_path.name}...")
+        
+        # Load image
+        image = cv2.imread(str(img_path), cv2.IMREAD_GRAYSCALE)
+        
+        # Enhance, reusing this thread's buffers while images keep the same shape
+        scratch = getattr(self._local, 'scratch', None)
+        if scratch is None or scratch[0].shape != image.shape:
+            scratch = self._local.scratch = (np.empty_like(image), np.empty_like(image))
+        
+        enhanced, _ = self.enhance_image(
+            image, modality, analyze_first=False,
+            denoise_method=denoise_method, scratch=scratch
+        )
+        
+        # Save
+        output_path = output_dir / f"enhanced_{img_path.name}"
+        cv2.imwrite(str(output_path), enhanced)
+        logger.info(f"Saved to {output_path}")
 
 
 def main():
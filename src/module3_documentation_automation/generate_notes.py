@@ -4,26 +4,43 @@ Automates clinical documentation using Azure OpenAI
 """
 
 import os
+import re
 import json
+import time
+import hashlib
+import sqlite3
+import threading
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
-import yaml
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AzureOpenAI, BadRequestError
+import numpy as np
 import pandas as pd
 
+from module3_documentation_automation.config_loader import load_config
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Cached ICD-10 suggestions are reused for 30 days
+ICD_CACHE_TTL = 30 * 24 * 3600
+
+# Hot diagnoses kept in memory in front of the on-disk cache
+ICD_MEMORY_CACHE_SIZE = 4096
+
+# Simplified ICD-10 code format
+ICD10_CODE_PATTERN = re.compile(r'^[A-Z][0-9]{2}\.?[0-9]{0,4}$')
+
 
 class ClinicalNoteGenerator:
     """Generate clinical notes using Azure OpenAI"""
     
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.client = AzureOpenAI(
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
@@ -221,22 +238,82 @@ Please generate a complete progress note in SOAP format.
 class ICD10CodingAutomation:
     """Automate ICD-10 coding using Azure OpenAI"""
     
-    def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+    def __init__(self, config_path: str = "config/config.yaml", cache_path: str = ".icd_cache.db"):
+        self.config = load_config(config_path)
         
         self.client = AzureOpenAI(
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
             api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            # Concurrent batch coding can hit 429s; the client retries them with exponential backoff
+            max_retries=5
         )
         
         self.deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4")
         self.confidence_threshold = self.config['clinical_documentation']['icd10_coding']['confidence_threshold']
         self.max_suggestions = self.config['clinical_documentation']['icd10_coding']['max_suggestions']
+        # JSON mode (response_format) needs a model that supports it, e.g. gpt-4o or
+        # gpt-4 1106+, and api-version 2023-12-01-preview or later. Set
+        # clinical_documentation.icd10_coding.json_mode: false for older
+        # deployments; it is also switched off after the first rejected request
+        self.json_mode = self.config['clinical_documentation']['icd10_coding'].get('json_mode', True)
         
         # Load ICD-10 reference data
         self.icd10_codes = self._load_icd10_reference()
+        self._known_codes = frozenset(self.icd10_codes)
+        
+        # On-disk cache of suggestions, shared by the batch worker threads
+        self._cache_lock = threading.Lock()
+        self._cache = sqlite3.connect(cache_path, check_same_thread=False)
+        self._cache.execute("PRAGMA journal_mode=WAL")
+        self._cache.execute(
+            "CREATE TABLE IF NOT EXISTS icd_suggestions ("
+            "key TEXT PRIMARY KEY, suggestions TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        # LRU of key -> (created, suggestions), guarded by the same lock
+        self._memory_cache = OrderedDict()
+    
+    @staticmethod
+    def _cache_key(diagnosis: str, clinical_context: str = None) -> str:
+        """Cache key from the normalized diagnosis and its clinical context"""
+        normalized = " ".join(str(diagnosis).lower().split())
+        return hashlib.sha1(f"{normalized}|{clinical_context or ''}".encode()).hexdigest()
+    
+    def _remember(self, key: str, created: float, suggestions: List[Dict]):
+        """Add an entry to the in-memory LRU; caller holds _cache_lock"""
+        self._memory_cache[key] = (created, suggestions)
+        self._memory_cache.move_to_end(key)
+        if len(self._memory_cache) > ICD_MEMORY_CACHE_SIZE:
+            self._memory_cache.popitem(last=False)
+    
+    def _cached_suggestions(self, key: str) -> Optional[List[Dict]]:
+        """Return unexpired cached suggestions from memory or disk, or None on a miss"""
+        oldest = time.time() - ICD_CACHE_TTL
+        with self._cache_lock:
+            entry = self._memory_cache.get(key)
+            if entry is not None and entry[0] > oldest:
+                self._memory_cache.move_to_end(key)
+                return entry[1]
+            
+            row = self._cache.execute(
+                "SELECT suggestions, created FROM icd_suggestions WHERE key = ? AND created > ?",
+                (key, oldest)
+            ).fetchone()
+            if row is None:
+                return None
+            suggestions = json.loads(row[0])
+            self._remember(key, row[1], suggestions)
+        return suggestions
+    
+    def _store_suggestions(self, key: str, suggestions: List[Dict]):
+        """Cache suggestions under key"""
+        created = time.time()
+        with self._cache_lock, self._cache:
+            self._remember(key, created, suggestions)
+            self._cache.execute(
+                "INSERT OR REPLACE INTO icd_suggestions (key, suggestions, created) VALUES (?, ?, ?)",
+                (key, json.dumps(suggestions), created)
+            )
     
     def _load_icd10_reference(self) -> Dict:
         """Load ICD-10 code reference (placeholder)"""
@@ -262,9 +339,28 @@ class ICD10CodingAutomation:
         """
         Suggest ICD-10 codes based on diagnosis
         
+        Repeated diagnoses are answered from the in-memory LRU or the on-disk cache.
+        
         Returns:
             List of dicts with 'code', 'description', and 'confidence'
         """
+        key = self._cache_key(diagnosis, clinical_context)
+        suggestions = self._cached_suggestions(key)
+        if suggestions is not None:
+            return suggestions
+        
+        suggestions = self._request_icd10_codes(diagnosis, clinical_context)
+        # Empty results are usually errors or unparseable replies; don't pin them
+        if suggestions:
+            self._store_suggestions(key, suggestions)
+        return suggestions
+    
+    def _request_icd10_codes(
+        self,
+        diagnosis: str,
+        clinical_context: str = None
+    ) -> List[Dict]:
+        """Ask Azure OpenAI for ICD-10 code suggestions"""
         try:
             # Build context-aware prompt
             prompt = f"""
@@ -278,16 +374,16 @@ DIAGNOSIS: {diagnosis}
             prompt += f"""
 
 Provide up to {self.max_suggestions} ICD-10 codes with descriptions.
-Format your response as a JSON array with this structure:
-[
+Respond with a JSON object with this structure:
+{{"suggestions": [
   {{"code": "XXX.XX", "description": "Description", "confidence": 0.95}},
   ...
-]
+]}}
 
 Only suggest codes you are confident about (confidence > {self.confidence_threshold}).
 """
             
-            response = self.client.chat.completions.create(
+            request = dict(
                 model=self.deployment,
                 messages=[
                     {
@@ -305,18 +401,24 @@ Only suggest codes you are confident about (confidence > {self.confidence_thresh
                 max_tokens=500
             )
             
-            # Parse response
-            content = response.choices[0].message.content
+            response = None
+            if self.json_mode:
+                try:
+                    response = self.client.chat.completions.create(
+                        **request, response_format={"type": "json_object"}
+                    )
+                except BadRequestError as e:
+                    logger.warning(
+                        f"Deployment {self.deployment} rejected JSON mode, retrying without it: {e}"
+                    )
+                    self.json_mode = False
+            if response is None:
+                response = self.client.chat.completions.create(**request)
             
-            # Extract JSON from response
-            import re
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                suggestions = json.loads(json_match.group())
-                return suggestions
-            else:
-                logger.warning("Could not parse ICD-10 suggestions from response")
-                return []
+            # Without JSON mode the object may come wrapped in prose or a code fence
+            content = response.choices[0].message.content
+            content = content[content.find('{'):content.rfind('}') + 1]
+            return json.loads(content).get('suggestions', [])
         
         except Exception as e:
             logger.error(f"Error suggesting ICD-10 codes: {e}")
@@ -330,10 +432,7 @@ Only suggest codes you are confident about (confidence > {self.confidence_thresh
             (is_valid, description)
         """
         # Check format (simplified)
-        import re
-        pattern = r'^[A-Z][0-9]{2}\.?[0-9]{0,4}$'
-        
-        if not re.match(pattern, code):
+        if not ICD10_CODE_PATTERN.match(code):
             return False, "Invalid ICD-10 code format"
         
         # Check against reference (in production, use full database)
@@ -342,24 +441,50 @@ Only suggest codes you are confident about (confidence > {self.confidence_thresh
         
         return True, "Code format valid (not in local reference)"
     
-    def batch_code_diagnoses(self, diagnoses_file: str) -> pd.DataFrame:
+    def validate_many(self, codes: Iterable[str]) -> np.ndarray:
+        """
+        Vectorized validation for bulk callers
+        
+        Returns:
+            Boolean array aligned with codes, True where a code is well formed
+            and in the local reference
+        """
+        codes = pd.Series(list(codes), dtype=object).astype(str)
+        valid_format = codes.str.match(ICD10_CODE_PATTERN).to_numpy(dtype=bool)
+        return valid_format & codes.isin(self._known_codes).to_numpy()
+    
+    def batch_code_diagnoses(self, diagnoses_file: str, max_workers: int = 16) -> pd.DataFrame:
         """
         Batch process diagnoses for ICD-10 coding
         
+        Requests are network-bound, so up to max_workers of them are in flight at once.
+        
         Args:
             diagnoses_file: CSV file with 'patient_id' and 'diagnosis' columns
+            max_workers: Maximum number of concurrent Azure OpenAI requests
         """
         df = pd.read_csv(diagnoses_file)
+        rows = df.to_dict('records')
         
-        results = []
-        for idx, row in df.iterrows():
-            logger.info(f"Processing {idx + 1}/{len(df)}: {row['diagnosis']}")
-            
-            suggestions = self.suggest_icd10_codes(
+        # Only request each distinct diagnosis/context pair once
+        keys = [self._cache_key(row['diagnosis'], row.get('clinical_context', None)) for row in rows]
+        unique = {}
+        for key, row in zip(keys, rows):
+            unique.setdefault(key, row)
+        
+        def code_row(idx, row):
+            logger.info(f"Processing {idx + 1}/{len(unique)}: {row['diagnosis']}")
+            return self.suggest_icd10_codes(
                 row['diagnosis'],
                 row.get('clinical_context', None)
             )
-            
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            coded = dict(zip(unique, executor.map(code_row, range(len(unique)), unique.values())))
+        
+        results = []
+        for idx, (key, row) in enumerate(zip(keys, rows)):
+            suggestions = coded[key]
             results.append({
                 'patient_id': row.get('patient_id', f'P{idx:05d}'),
                 'diagnosis': row['diagnosis'],
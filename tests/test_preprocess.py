@@ -0,0 +1,69 @@
+"""
+Tests for Module 1 image preprocessing
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+for dependency in ("pydicom", "nibabel", "sklearn"):
+    pytest.importorskip(dependency)
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from module1_data_preprocessing.preprocess import DataPreprocessor
+
+
+@pytest.fixture
+def preprocessor():
+    """DataPreprocessor without a config file on disk"""
+    processor = object.__new__(DataPreprocessor)
+    processor.image_size = (32, 24)
+    processor.norm_method = 'min_max'
+    return processor
+
+
+def _images(shape, count=3, dtype=np.uint8):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=shape).astype(dtype) for _ in range(count)]
+
+
+@pytest.mark.parametrize("shape", [(40, 50), (40, 50, 3)])
+@pytest.mark.parametrize("normalize", [True, False])
+def test_preprocess_batch_matches_preprocess(preprocessor, shape, normalize):
+    images = _images(shape)
+    
+    batch = preprocessor.preprocess_batch(images, normalize=normalize)
+    expected = np.stack([preprocessor.preprocess(image, normalize=normalize) for image in images])
+    
+    assert batch.shape == expected.shape == (3, 24, 32) + shape[2:]
+    np.testing.assert_allclose(batch, expected)
+
+
+def test_preprocess_batch_mixed_dtypes_fall_back(preprocessor):
+    images = _images((40, 50, 3), count=1) + _images((40, 50, 3), count=1, dtype=np.float32)
+    
+    batch = preprocessor.preprocess_batch(images, normalize=False)
+    
+    assert batch.shape == (2, 24, 32, 3)
+    np.testing.assert_allclose(batch[1], preprocessor.resize(images[1]))
+
+
+def test_preprocess_batch_rejects_empty_batch(preprocessor):
+    with pytest.raises(ValueError):
+        preprocessor.preprocess_batch([])
+
+
+def test_batch_preprocess_empty_batch(preprocessor):
+    assert preprocessor.batch_preprocess([]) == []
+
+
+def test_batch_preprocess_keeps_mixed_sizes_without_resize(preprocessor):
+    images = _images((40, 50), count=1) + _images((30, 20), count=1)
+    
+    processed = preprocessor.batch_preprocess(images, resize=False)
+    
+    assert isinstance(processed, list)
+    assert [image.shape for image in processed] == [(40, 50), (30, 20)]